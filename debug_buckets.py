@@ -3,10 +3,61 @@
 Script de debug para investigar problemas com buckets.
 """
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import sys
 
+# Mesma detecção de engines, mesmas regras e mesma normalização de bucket do pipeline
+from pipeline import EXCEL_ENGINE, STRING_DTYPE, PlannerConfig, normalize_bucket
+
+# Palavras-chave das colunas usadas no diagnóstico
+_NEEDED_KEYWORDS = ('bucket', 'status', 'data')
+
+
+# Buckets que podem ter datas, já normalizados
+_ALLOWED_NORM = PlannerConfig.ACTIVE_BUCKETS_NORMALIZED
+
+
+def _is_needed(col) -> bool:
+    """Indica se a coluna é usada no diagnóstico."""
+    return any(k in str(col).lower() for k in _NEEDED_KEYWORDS)
+
+
+def load_needed_columns(file_path: Path):
+    """
+    Carrega apenas as colunas de bucket/status/data do arquivo.
+    
+    Com calamine usa o pandas diretamente; sem ele, percorre a planilha com
+    openpyxl em modo read_only, guardando só as células das colunas usadas.
+    
+    Returns:
+        Tupla (DataFrame com as colunas usadas, lista com todas as colunas)
+    """
+    if EXCEL_ENGINE == 'calamine':
+        with pd.ExcelFile(file_path, engine=EXCEL_ENGINE) as xl:
+            all_cols = list(xl.parse(nrows=0).columns)
+            df = xl.parse(usecols=[col for col in all_cols if _is_needed(col)],
+                          dtype=STRING_DTYPE)
+        return df, all_cols
+    
+    from openpyxl import load_workbook
+    
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        all_cols = [h for h in header if h is not None]
+        keep = [i for i, h in enumerate(header) if h is not None and _is_needed(h)]
+        data = [tuple(row[i] if i < len(row) else None for i in keep)
+                for row in rows if any(v is not None for v in row)]
+    finally:
+        wb.close()
+    
+    df = pd.DataFrame(data, columns=[header[i] for i in keep], dtype=object)
+    return df.astype(STRING_DTYPE), all_cols
+
+
 def debug_buckets(file_path: Path):
     """Debug dos buckets encontrados no arquivo."""
     
@@ -14,8 +65,8 @@ def debug_buckets(file_path: Path):
     print("DEBUG DE BUCKETS")
     print("="*60)
     
-    # Carregar arquivo
-    df = pd.read_excel(file_path)
+    # Carregar arquivo (apenas colunas de bucket/status/data)
+    df, all_cols = load_needed_columns(file_path)
     print(f"Arquivo carregado: {len(df)} linhas")
     print()
     
@@ -27,7 +78,7 @@ def debug_buckets(file_path: Path):
     if not bucket_cols:
         print("❌ Nenhuma coluna de bucket/status encontrada!")
         print("Colunas disponíveis:")
-        for col in df.columns:
+        for col in all_cols:
             print(f"  - {col}")
         return
     
@@ -35,54 +86,35 @@ def debug_buckets(file_path: Path):
     print(f"Usando coluna: '{bucket_col}'")
     print()
     
-    # Valores únicos
-    unique_values = df[bucket_col].dropna().unique()
+    # Fatorar a coluna uma única vez: contagem, normalização e classificação
+    # rodam sobre os códigos inteiros e os poucos valores únicos
+    codes, uniques = pd.factorize(df[bucket_col])
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
     print("VALORES ÚNICOS ENCONTRADOS:")
-    for i, value in enumerate(unique_values, 1):
-        count = (df[bucket_col] == value).sum()
+    for i, (value, count) in enumerate(zip(uniques, counts), 1):
         print(f"{i:2d}. '{value}' - {count} registros")
     print()
     
-    # Normalização
+    norm_uniques = [normalize_bucket(value) for value in uniques]
+    
     print("NORMALIZAÇÃO:")
-    normalized_map = {}
-    for value in unique_values:
-        if pd.notna(value):
-            normalized = (str(value).strip().lower()
-                         .replace('ç', 'c')
-                         .replace('ã', 'a')
-                         .replace('í', 'i')
-                         .replace('ú', 'u')
-                         .replace('õ', 'o'))
-            normalized_map[value] = normalized
-            print(f"'{value}' -> '{normalized}'")
+    normalized_map = dict(zip(uniques, norm_uniques))
+    for value, normalized in normalized_map.items():
+        print(f"'{value}' -> '{normalized}'")
     print()
     
     # Buckets permitidos
-    allowed = ['execução', 'aguardando validação', 'concluídos', 'concluido', 'concluida', 'concluidas']
-    allowed_normalized = []
-    for bucket in allowed:
-        norm = (bucket.lower()
-               .replace('ç', 'c')
-               .replace('ã', 'a')
-               .replace('í', 'i')
-               .replace('ú', 'u')
-               .replace('õ', 'o')
-               .replace('ê', 'e')
-               .replace('é', 'e')
-               .replace('á', 'a')
-               .replace('ó', 'o'))
-        allowed_normalized.append(norm)
-    
     print("BUCKETS PERMITIDOS (normalizados):")
-    for bucket in allowed_normalized:
+    for bucket in sorted(_ALLOWED_NORM):
         print(f"  - '{bucket}'")
     print()
     
     # Verificar compatibilidade
+    allowed_by_code = np.array([n in _ALLOWED_NORM for n in norm_uniques], dtype=bool)
+    allowed_by_original = dict(zip(uniques, allowed_by_code))
     print("COMPATIBILIDADE:")
-    for original, normalized in normalized_map.items():
-        if normalized in allowed_normalized:
+    for original, permitted in allowed_by_original.items():
+        if permitted:
             status = "✅ PERMITIDO"
         else:
             status = "❌ SERÁ REMOVIDO"
@@ -93,20 +125,20 @@ def debug_buckets(file_path: Path):
     date_cols = [col for col in df.columns if 'data' in col.lower() and ('início' in col.lower() or 'entrega' in col.lower())]
     if date_cols:
         print("ANÁLISE DE DATAS POR BUCKET:")
-        for original in unique_values:
-            if pd.notna(original):
-                bucket_data = df[df[bucket_col] == original]
-                normalized = normalized_map[original]
-                will_keep = normalized in allowed_normalized
-                
-                print(f"\nBucket: '{original}' ({len(bucket_data)} registros)")
-                print(f"Normalizado: '{normalized}'")
-                print(f"Status: {'✅ Datas mantidas' if will_keep else '❌ Datas serão removidas'}")
-                
-                for date_col in date_cols:
-                    if date_col in df.columns:
-                        filled = bucket_data[date_col].notna().sum()
-                        print(f"  {date_col}: {filled}/{len(bucket_data)} preenchidas")
+        # Matriz bucket x coluna de datas preenchidas em um único groupby
+        fill_matrix = df[date_cols].notna().astype(np.int32).groupby(codes, sort=False).sum()
+        for code, original in enumerate(uniques):
+            total = counts[code]
+            normalized = norm_uniques[code]
+            will_keep = bool(allowed_by_code[code])
+            
+            print(f"\nBucket: '{original}' ({total} registros)")
+            print(f"Normalizado: '{normalized}'")
+            print(f"Status: {'✅ Datas mantidas' if will_keep else '❌ Datas serão removidas'}")
+            
+            for date_col in date_cols:
+                filled = fill_matrix.loc[code, date_col]
+                print(f"  {date_col}: {filled}/{total} preenchidas")
 
 
 if __name__ == "__main__":
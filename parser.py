@@ -11,6 +11,7 @@ import re
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 
@@ -36,6 +37,38 @@ class DateParsingConfig:
         'dd-mm-yyyy': r'^\d{1,2}-\d{1,2}-\d{4}',
         'dd.mm.yyyy': r'^\d{1,2}\.\d{1,2}\.\d{4}',
     }
+    
+    # Textos que representam valores nulos (ex.: NaN convertido com astype(str)),
+    # em minúsculas: comparar sempre com o texto já convertido por .str.lower()
+    NULL_STRINGS = ['nan', 'nat']
+
+
+# Formatos congelados em tupla para o fallback de parse_single_date
+_DATE_FORMATS = tuple(DateParsingConfig.DATE_FORMATS)
+
+# Todos os padrões em uma única alternância, compilada uma vez na importação.
+# Cada padrão vira um grupo, na mesma ordem de DATE_PATTERNS.
+_DATE_PATTERN_NAMES = list(DateParsingConfig.DATE_PATTERNS)
+_COMBINED_DATE_RE = re.compile(
+    '|'.join(f'({p})' for p in DateParsingConfig.DATE_PATTERNS.values())
+)
+
+
+# Tipos inferidos (pd.api.types.infer_dtype) de colunas object com textos
+_TEXT_INFERRED_TYPES = frozenset({'string', 'mixed', 'mixed-integer'})
+
+
+def _is_text(series: pd.Series) -> bool:
+    """
+    Indica se a série tem textos e aceita o acessor .str.
+    
+    StringDtype sempre; colunas object só se houver strings entre os valores
+    (ex.: datas do Excel com células vazias ficam object sem nenhum texto).
+    """
+    if isinstance(series.dtype, pd.StringDtype):
+        return True
+    return (pd.api.types.is_object_dtype(series) and
+            pd.api.types.infer_dtype(series, skipna=True) in _TEXT_INFERRED_TYPES)
 
 
 def validate_date_string(date_str: str) -> bool:
@@ -51,14 +84,7 @@ def validate_date_string(date_str: str) -> bool:
     if not isinstance(date_str, str) or not date_str.strip():
         return False
     
-    date_str = date_str.strip()
-    
-    # Verificar padrões conhecidos
-    for pattern_name, pattern in DateParsingConfig.DATE_PATTERNS.items():
-        if re.match(pattern, date_str):
-            return True
-    
-    return False
+    return bool(_COMBINED_DATE_RE.match(date_str.strip()))
 
 
 def parse_single_date(date_value: any, 
@@ -67,6 +93,9 @@ def parse_single_date(date_value: any,
     """
     Tenta parsear uma única data usando múltiplos formatos.
     
+    Para colunas inteiras use parse_dates(), que converte tudo em lote;
+    esta função fica reservada às poucas linhas que o lote não resolve.
+    
     Args:
         date_value: Valor para parsear (string, datetime, etc.)
         dayfirst: Se True, assume formato DD/MM/YYYY
@@ -89,14 +118,13 @@ def parse_single_date(date_value: any,
         logging.debug(f"Formato de data não reconhecido: '{date_str}'")
         return None
     
-    # Tentar pandas built-in primeiro
-    try:
-        return pd.to_datetime(date_str, dayfirst=dayfirst, errors='raise')
-    except:
-        pass
+    # Tentar pandas built-in primeiro (sem criar exceção a cada falha)
+    parsed = pd.to_datetime(date_str, dayfirst=dayfirst, errors='coerce')
+    if parsed is not pd.NaT:
+        return pd.Timestamp(parsed)
     
     # Tentar formatos específicos
-    for fmt in DateParsingConfig.DATE_FORMATS:
+    for fmt in _DATE_FORMATS:
         try:
             parsed = datetime.strptime(date_str, fmt)
             return pd.Timestamp(parsed)
@@ -126,21 +154,25 @@ def analyze_date_column(df: pd.DataFrame, col: str) -> Dict:
     
     # Contar diferentes tipos de valores
     null_count = series.isna().sum()
-    empty_count = (series.astype(str).str.strip() == '').sum()
-    nan_string_count = (series.astype(str).str.lower() == 'nan').sum()
+    if _is_text(series):
+        empty_count = series.str.strip().eq('').sum()
+        nan_string_count = series.str.lower().isin(DateParsingConfig.NULL_STRINGS).sum()
+    else:
+        # Colunas já tipadas (ex.: datetime) não têm textos vazios ou 'nan'
+        empty_count = nan_string_count = 0
     
     valid_data = total - null_count - empty_count - nan_string_count
     
-    # Analisar formatos de data
-    sample_values = series.dropna().astype(str).str.strip()
-    sample_values = sample_values[sample_values != 'nan'].head(10)
+    # Analisar formatos de data (conversão limitada a uma amostra)
+    sample_values = series.dropna().iloc[:1000].astype('string').str.strip()
+    sample_values = sample_values[
+        ~sample_values.str.lower().isin(DateParsingConfig.NULL_STRINGS)
+    ].head(10)
     
-    formats_found = []
-    for value in sample_values:
-        for pattern_name, pattern in DateParsingConfig.DATE_PATTERNS.items():
-            if re.match(pattern, value):
-                formats_found.append(pattern_name)
-                break
+    # Uma única passada de regex: o grupo preenchido indica o formato
+    matched = sample_values.str.extract(_COMBINED_DATE_RE).notna()
+    matched.columns = _DATE_PATTERN_NAMES
+    formats_found = matched.idxmax(axis=1)[matched.any(axis=1)].tolist()
     
     return {
         'column': col,
@@ -157,7 +189,8 @@ def analyze_date_column(df: pd.DataFrame, col: str) -> Dict:
 def parse_dates(df: pd.DataFrame, 
                date_cols: List[str], 
                dayfirst: bool = True,
-               verbose: bool = True) -> pd.DataFrame:
+               verbose: bool = True,
+               inplace: bool = False) -> pd.DataFrame:
     """
     Converte colunas de data de strings para datetime com análise detalhada.
     
@@ -166,47 +199,82 @@ def parse_dates(df: pd.DataFrame,
         date_cols: Lista de colunas de data para converter
         dayfirst: Se True, assume formato DD/MM/YYYY
         verbose: Se True, registra estatísticas detalhadas
+        inplace: Se True, altera o próprio df em vez de uma cópia
         
     Returns:
         DataFrame com colunas de data convertidas
     """
-    df_copy = df.copy()
+    # Cópia rasa basta: as colunas de data são substituídas, nunca alteradas no lugar
+    df_copy = df if inplace else df.copy(deep=False)
     parsing_stats = {}
     
     logging.info(f"Convertendo {len(date_cols)} colunas de data")
     
-    for col in date_cols:
-        if col not in df_copy.columns:
-            continue
-        
-        # Backup da coluna original
-        backup_col = f"{col}_original"
-        df_copy[backup_col] = df_copy[col].astype(str)
-        
-        # Parsing usando pandas built-in
-        original_values = df_copy[col].copy()
-        df_copy[col] = pd.to_datetime(df_copy[col], dayfirst=dayfirst, errors='coerce')
-        
-        # Contar sucessos e falhas
-        successful = df_copy[col].notna().sum()
-        failed = df_copy[col].isna().sum() - original_values.isna().sum()
-        
+    present_cols = [col for col in date_cols if col in df_copy.columns]
+    if not present_cols:
+        return df_copy
+    
+    # Colunas que já chegam como datetime64 (células de data do Excel ou
+    # blocos já processados) são reaproveitadas sem novo parsing
+    def to_datetime(series: pd.Series) -> pd.Series:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        return pd.to_datetime(series, dayfirst=dayfirst, errors='coerce', format='mixed')
+    
+    # Parsing de todas as colunas em uma única chamada
+    original_values = df_copy[present_cols]
+    original_notna = original_values.notna()
+    parsed = original_values.apply(to_datetime)
+    
+    # Fallback escalar apenas para as linhas que o lote não resolveu
+    remaining = parsed.isna() & original_notna
+    for col in remaining.columns[remaining.any()]:
+        rows = remaining[col]
+        parsed.loc[rows, col] = pd.to_datetime(
+            original_values.loc[rows, col].map(
+                lambda v: parse_single_date(v, dayfirst=dayfirst))
+        )
+    
+    df_copy[present_cols] = parsed
+    
+    # Contar sucessos e falhas de todas as colunas de uma vez
+    successful = parsed.notna().sum()
+    failed = original_notna.sum() - successful
+    
+    for col in present_cols:
+        col_ok, col_failed = int(successful[col]), int(failed[col])
         parsing_stats[col] = {
-            'successful': successful,
-            'failed': failed,
-            'success_rate': successful / (successful + failed) * 100 if (successful + failed) > 0 else 0
+            'successful': col_ok,
+            'failed': col_failed,
+            'success_rate': col_ok / (col_ok + col_failed) * 100 if (col_ok + col_failed) > 0 else 0
         }
         
-        if verbose and failed > 0:
-            logging.warning(f"{col}: {failed} datas falharam no parsing")
-        
-        # Remover coluna de backup se parsing foi 100% bem-sucedido
-        if failed == 0:
-            df_copy = df_copy.drop(columns=[backup_col])
+        if col_failed > 0:
+            if verbose:
+                failed_values = original_values.loc[original_notna[col] & parsed[col].isna(), col]
+                logging.warning(f"{col}: {col_failed} datas falharam no parsing")
+                logging.debug(f"{col}: exemplos de falhas {failed_values.head(5).tolist()}")
+            
+            # Backup da coluna original apenas quando há falhas para auditar
+            df_copy[f"{col}_original"] = original_values[col].astype(str)
     
     return df_copy
 
 
+def _normalized_bucket_categorical(df: pd.DataFrame, bucket_col: str) -> pd.Categorical:
+    """
+    Retorna os buckets normalizados (strip + lower) como Categorical.
+    
+    A normalização roda só sobre os valores distintos; os códigos das linhas
+    são remapeados por indexação, e as comparações usam os códigos inteiros.
+    """
+    raw = pd.Categorical(df[bucket_col])
+    norm_codes, norm_uniques = pd.factorize(raw.categories.str.strip().str.lower())
+    # Código -1 (ausente) continua -1 pelo elemento extra no fim
+    codes = np.append(norm_codes, -1)[raw.codes]
+    return pd.Categorical.from_codes(codes, categories=norm_uniques)
+
+
 def debug_missing_due(df: pd.DataFrame, 
                      bucket_col: str, 
                      due_raw_col: str, 
@@ -226,19 +294,33 @@ def debug_missing_due(df: pd.DataFrame,
         DataFrame original (sem modificações)
     """
     try:
-        # Máscaras para identificar problemas
-        mask_target_bucket = (df[bucket_col]
-                             .str.strip()
-                             .str.lower() == target_bucket.lower())
+        # Máscaras para identificar problemas, como arrays numpy
+        bucket_cat = _normalized_bucket_categorical(df, bucket_col)
+        target_norm = target_bucket.strip().lower()
+        if target_norm in bucket_cat.categories:
+            target_code = bucket_cat.categories.get_loc(target_norm)
+            mask_target_bucket = bucket_cat.codes == target_code
+        else:
+            mask_target_bucket = np.zeros(len(df), dtype=bool)
         
-        mask_raw_has_data = (df[due_raw_col].notna() & 
-                            (df[due_raw_col].astype(str).str.strip() != '') &
-                            (df[due_raw_col].astype(str).str.lower() != 'nan'))
+        raw = df[due_raw_col]
+        masks = [mask_target_bucket, pd.notna(raw.to_numpy())]
+        if isinstance(raw.dtype, pd.CategoricalDtype):
+            # Avaliar só as categorias e expandir pelos códigos
+            cats = raw.cat.categories
+            valid_cats = (cats.str.strip().str.len() > 0) & ~cats.str.lower().isin(DateParsingConfig.NULL_STRINGS)
+            codes = raw.cat.codes.to_numpy()
+            masks.append(np.append(np.asarray(valid_cats, dtype=bool), False)[codes])
+        elif _is_text(raw):
+            masks.append((raw.str.strip().str.len().fillna(0) > 0).to_numpy())
+            masks.append(~raw.str.lower().isin(DateParsingConfig.NULL_STRINGS).to_numpy())
+        masks.append(pd.isna(df[due_parsed_col].to_numpy()))
         
-        mask_parsed_failed = df[due_parsed_col].isna()
-        
-        # Combinar máscaras para encontrar problemas
-        problem_mask = mask_target_bucket & mask_raw_has_data & mask_parsed_failed
+        # Combinar máscaras reaproveitando um único buffer
+        problem_mask = np.empty(len(df), dtype=bool)
+        np.logical_and(masks[0], masks[1], out=problem_mask)
+        for mask in masks[2:]:
+            np.logical_and(problem_mask, mask, out=problem_mask)
         
         problem_count = problem_mask.sum()
         
@@ -269,6 +351,11 @@ def validate_parsed_dates(df: pd.DataFrame,
     """
     validation_results = {}
     
+    # Limites da faixa em nanossegundos: [1º jan min_year, 1º jan max_year+1)
+    min_ns = np.datetime64(f'{min_year}-01-01', 'ns').astype(np.int64)
+    max_ns = np.datetime64(f'{max_year + 1}-01-01', 'ns').astype(np.int64) - 1
+    span = np.uint64(max_ns - min_ns)
+    
     for col in date_cols:
         if col not in df.columns:
             continue
@@ -278,9 +365,10 @@ def validate_parsed_dates(df: pd.DataFrame,
             validation_results[col] = {'status': 'empty'}
             continue
         
-        # Verificar faixa de anos
-        years = date_series.dt.year
-        invalid_years = ((years < min_year) | (years > max_year)).sum()
+        # Verificar faixa de anos com uma única comparação sem sinal:
+        # valores abaixo de min_ns dão a volta e ficam maiores que span
+        arr = date_series.to_numpy(dtype='datetime64[ns]').view(np.uint64)
+        invalid_years = int(np.count_nonzero((arr - np.uint64(min_ns)) > span))
         
         # Verificar datas futuras (para algumas colunas)
         today = pd.Timestamp.now()
@@ -290,7 +378,7 @@ def validate_parsed_dates(df: pd.DataFrame,
             'total_dates': len(date_series),
             'invalid_years': invalid_years,
             'future_dates': future_dates,
-            'year_range': f"{years.min()}-{years.max()}",
+            'year_range': f"{date_series.min().year}-{date_series.max().year}",
             'status': 'valid' if invalid_years == 0 else 'has_issues'
         }
         
@@ -6,14 +6,58 @@ Este módulo contém todas as transformações aplicadas aos dados exportados
 do Planner, incluindo limpeza, normalização e formatação.
 """
 
+import hashlib
 import logging
+import os
+import sys
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
 
 from parser import parse_dates, debug_missing_due
 
+try:
+    import python_calamine  # noqa: F401
+    # Leitor em Rust: muito mais rápido que o openpyxl em exportações grandes
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+try:
+    import xlsxwriter  # noqa: F401
+    # Escrita sequencial, sem montar o modelo de células do openpyxl em memória
+    EXCEL_WRITER = 'xlsxwriter'
+except ImportError:
+    EXCEL_WRITER = 'openpyxl'
+
+try:
+    import pyarrow  # noqa: F401
+    # Strings em buffers Arrow: .str.strip()/.str.lower() rodam em kernels nativos
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'string'
+
+# Código do pipeline e do parser: entra na chave do cache de resultados
+_SOURCE_FILES = (Path(__file__), Path(sys.modules[parse_dates.__module__].__file__))
+
+# Formatos que o openpyxl lê em modo read_only (leitura em blocos de iter_chunks)
+_STREAMABLE_SUFFIXES = frozenset({'.xlsx', '.xlsm', '.xltx', '.xltm'})
+
+# Tabela de remoção de acentos: uma única passada por string via str.translate
+_ACCENT_TBL = str.maketrans("çãíúõêéáó", "caiuoeeao")
+
+
+def normalize_bucket(name) -> str:
+    """
+    Normaliza um nome de bucket para comparação (strip + lower + acentos).
+    
+    É a regra usada para decidir quais buckets podem ter datas; o
+    debug_buckets importa esta mesma função para mostrar a mesma decisão.
+    """
+    return str(name).strip().lower().translate(_ACCENT_TBL)
+
 
 # Configurações centralizadas
 class PlannerConfig:
@@ -34,12 +78,25 @@ class PlannerConfig:
         'Concluído em': 'Data de conclusão',
     }
     
+    # Colunas de texto lidas diretamente como string (nomes originais)
+    TEXT_COLUMNS = [
+        'Identificação da tarefa',
+        'Nome da tarefa',
+        'Nome do Bucket',
+        'Atribuído a',
+        'Criado por',
+        'Prioridade',
+    ]
+    
     # Buckets que devem ter datas zeradas
     INACTIVE_BUCKETS = ['backlog', 'a fazer']
     
     # Buckets que PODEM ter datas de início e entrega
     ACTIVE_BUCKETS = ['execução', 'aguardando validação', 'concluídos', 'concluido', 'concluida', 'concluidas']
     
+    # Mesmos buckets já normalizados (calculado uma vez, na definição da classe)
+    ACTIVE_BUCKETS_NORMALIZED = frozenset(normalize_bucket(b) for b in ACTIVE_BUCKETS)
+    
     # Colunas de data para processamento
     DATE_COLUMNS = [
         'Data de criação',
@@ -53,6 +110,12 @@ class PlannerConfig:
     
     # Configuração para preenchimento de datas de início
     START_DATE_FILL_DAYS = 20  # Quantos dias antes da entrega
+    
+    # Linhas por bloco no processamento em partes (main com chunk_size)
+    CHUNK_SIZE = 50_000
+    
+    # Pasta (dentro do diretório de saída) com resultados já processados
+    CACHE_DIR_NAME = '.cache'
 
 
 def load_and_rename(input_path: Path) -> pd.DataFrame:
@@ -70,7 +133,12 @@ def load_and_rename(input_path: Path) -> pd.DataFrame:
         pd.errors.EmptyDataError: Se arquivo estiver vazio
     """
     try:
-        df = pd.read_excel(input_path)
+        # Todas as colunas seguem para a saída; as de texto já chegam como string
+        df = pd.read_excel(
+            input_path,
+            engine=EXCEL_ENGINE,
+            dtype={col: STRING_DTYPE for col in PlannerConfig.TEXT_COLUMNS}
+        )
         
         if df.empty:
             raise pd.errors.EmptyDataError("Arquivo Excel está vazio")
@@ -78,7 +146,7 @@ def load_and_rename(input_path: Path) -> pd.DataFrame:
         logging.info(f"Arquivo carregado: {len(df)} linhas, {len(df.columns)} colunas")
         
         # Aplicar renomeação
-        df = df.rename(columns=PlannerConfig.COLUMN_MAPPING)
+        df.rename(columns=PlannerConfig.COLUMN_MAPPING, inplace=True)
         
         return df
         
@@ -90,6 +158,101 @@ def load_and_rename(input_path: Path) -> pd.DataFrame:
         raise
 
 
+def iter_chunks(input_path: Path, chunk_size: int = PlannerConfig.CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Lê o arquivo Excel em blocos de linhas, já com as colunas renomeadas.
+    
+    A planilha é percorrida uma única vez com openpyxl em modo read_only
+    (iter_rows), de modo que só as linhas do bloco atual ficam em memória.
+    Linhas totalmente vazias são ignoradas e nomes de coluna repetidos
+    ganham sufixo (X, X.1), como no read_excel. Formatos que o openpyxl
+    não lê (ex.: .xls) são carregados inteiros e depois fatiados.
+    
+    Args:
+        input_path: Caminho do arquivo Excel
+        chunk_size: Quantidade de linhas por bloco
+        
+    Yields:
+        DataFrame de cada bloco com colunas renomeadas
+        
+    Raises:
+        pd.errors.EmptyDataError: Se arquivo estiver vazio
+    """
+    if input_path.suffix.lower() not in _STREAMABLE_SUFFIXES:
+        df = load_and_rename(input_path)
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start:start + chunk_size].copy()
+            logging.info(f"Bloco carregado: linhas {start + 1} a {start + len(chunk)}")
+            yield chunk
+        return
+    
+    from openpyxl import load_workbook
+    
+    wb = load_workbook(input_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        columns = _dedupe_columns(header)
+        width = len(columns)
+        
+        start = 0
+        block = []
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            block.append(tuple(row[:width]) + (None,) * (width - len(row)))
+            if len(block) == chunk_size:
+                yield _block_to_frame(block, columns, start)
+                start += len(block)
+                block = []
+        
+        if block:
+            yield _block_to_frame(block, columns, start)
+        elif start == 0:
+            raise pd.errors.EmptyDataError("Arquivo Excel está vazio")
+    finally:
+        wb.close()
+
+
+def _dedupe_columns(header: tuple) -> List:
+    """
+    Monta os nomes das colunas a partir do cabeçalho, como o read_excel.
+    
+    Células vazias viram "Unnamed: i" e nomes repetidos ganham sufixo
+    (X, X.1, X.2...), pulando sufixos que já existem no cabeçalho; as colunas
+    sem nome são tratadas por último, na mesma ordem do pandas.
+    """
+    names = [h if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+    existing = set(names)
+    unnamed = [i for i, h in enumerate(header) if h is None]
+    order = [i for i, h in enumerate(header) if h is not None] + unnamed
+    
+    counts: Dict = {}
+    for i in order:
+        name = original = names[i]
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            count = count + 1 if name in existing else counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def _block_to_frame(block: List[tuple], columns: List[str], start: int) -> pd.DataFrame:
+    """Monta o DataFrame de um bloco de linhas lidas por iter_chunks."""
+    logging.info(f"Bloco carregado: linhas {start + 1} a {start + len(block)}")
+    
+    chunk = pd.DataFrame(block, columns=columns, dtype=object,
+                         index=pd.RangeIndex(start, start + len(block)))
+    chunk = chunk.infer_objects()
+    text_cols = [col for col in PlannerConfig.TEXT_COLUMNS if col in chunk.columns]
+    chunk[text_cols] = chunk[text_cols].astype(STRING_DTYPE)
+    chunk.rename(columns=PlannerConfig.COLUMN_MAPPING, inplace=True)
+    return chunk
+
+
 def validate_required_columns(df: pd.DataFrame) -> None:
     """
     Valida se todas as colunas essenciais estão presentes.
@@ -115,17 +278,27 @@ def clean_string_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Limpa colunas de texto removendo espaços extras.
     
+    Valores ausentes continuam ausentes (não viram o texto 'nan') e valores
+    não textuais em colunas object, como datas do Excel, são mantidos.
+    
     Args:
         df: DataFrame para limpar
         
     Returns:
         DataFrame com strings limpas
     """
-    string_columns = df.select_dtypes(include=['object']).columns
+    def strip_text(series: pd.Series) -> pd.Series:
+        # Só textos de verdade: colunas object podem não ter nenhuma string
+        # (ex.: booleanos com células vazias) e aí o acessor .str falha
+        if (isinstance(series.dtype, pd.StringDtype) or
+                pd.api.types.infer_dtype(series, skipna=True) == 'string'):
+            return series.str.strip()
+        return series.map(lambda v: v.strip() if isinstance(v, str) else v)
     
-    for col in string_columns:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
+    string_columns = df.select_dtypes(include=['object', 'string']).columns
+    
+    if len(string_columns) > 0:
+        df[string_columns] = df[string_columns].apply(strip_text)
     
     return df
 
@@ -166,91 +339,95 @@ def validate_dates_by_bucket(df: pd.DataFrame,
         due_col: Nome da coluna de data de entrega
         
     Returns:
-        DataFrame com datas validadas por bucket
+        O próprio DataFrame, alterado no lugar, com datas validadas por bucket
     """
     if bucket_col not in df.columns:
-        logging.warning(f"Coluna '{bucket_col}' não encontrada. Pulando validação de datas por bucket.")
+        logging.warning("Coluna '%s' não encontrada. Pulando validação de datas por bucket.", bucket_col)
         return df
     
+    # Logs abaixo só montam listas/contagens quando o nível INFO está ativo
+    log_info = logging.getLogger().isEnabledFor(logging.INFO)
+    
     # PRIMEIRO: Log dos buckets únicos encontrados para debug
-    unique_buckets = df[bucket_col].dropna().unique()
-    logging.info(f"Buckets encontrados no arquivo: {list(unique_buckets)}")
-    
-    # Normalizar nomes dos buckets para comparação
-    df_copy = df.copy()
-    df_copy['bucket_normalized'] = (df_copy[bucket_col]
-                                   .str.strip()
-                                   .str.lower()
-                                   .str.replace('ç', 'c')
-                                   .str.replace('ã', 'a')
-                                   .str.replace('í', 'i')
-                                   .str.replace('ú', 'u')
-                                   .str.replace('õ', 'o')
-                                   .str.replace('ê', 'e')
-                                   .str.replace('é', 'e')
-                                   .str.replace('á', 'a')
-                                   .str.replace('ó', 'o'))
-    
-    # Normalizar buckets permitidos também
-    allowed_buckets_normalized = []
-    for bucket in PlannerConfig.ACTIVE_BUCKETS:
-        normalized = (bucket.lower()
-                     .replace('ç', 'c')
-                     .replace('ã', 'a') 
-                     .replace('í', 'i')
-                     .replace('ú', 'u')
-                     .replace('õ', 'o')
-                     .replace('ê', 'e')
-                     .replace('é', 'e')
-                     .replace('á', 'a')
-                     .replace('ó', 'o'))
-        allowed_buckets_normalized.append(normalized)
-    
-    logging.info(f"Buckets permitidos (normalizados): {allowed_buckets_normalized}")
-    
-    # Log dos buckets normalizados encontrados
-    unique_normalized = df_copy['bucket_normalized'].dropna().unique()
-    logging.info(f"Buckets encontrados (normalizados): {list(unique_normalized)}")
-    
-    # Identificar buckets que NÃO podem ter datas
-    mask_invalid_bucket = ~df_copy['bucket_normalized'].isin(allowed_buckets_normalized)
+    if log_info:
+        logging.info("Buckets encontrados no arquivo: %s", list(df[bucket_col].dropna().unique()))
+    
+    # Normalizar apenas os valores distintos: o bucket vira categórico e a
+    # normalização roda sobre as poucas categorias, não sobre cada linha
+    bucket_cat = df[bucket_col].astype('category')
+    categories = bucket_cat.cat.categories
+    normalized_categories = pd.Index(categories).map(normalize_bucket)
+    
+    allowed_buckets_normalized = PlannerConfig.ACTIVE_BUCKETS_NORMALIZED
+    
+    if log_info:
+        logging.info("Buckets permitidos (normalizados): %s", sorted(allowed_buckets_normalized))
+        
+        # Log dos buckets normalizados encontrados
+        logging.info("Buckets encontrados (normalizados): %s", list(normalized_categories.unique()))
+    
+    # Identificar buckets que NÃO podem ter datas (consulta por código inteiro;
+    # valores ausentes têm código -1 e também são tratados como inválidos)
+    bucket_codes = bucket_cat.cat.codes.to_numpy()
+    allowed_categories = normalized_categories.isin(allowed_buckets_normalized)
+    
+    # Caminho rápido: todos os buckets permitidos e nenhum ausente
+    if allowed_categories.all() and not (bucket_codes < 0).any():
+        logging.info("✅ Nenhuma data removida - todos os buckets estão permitidos")
+        return df
+    
+    # Um bit por categoria, indexado pelos códigos; o elemento extra no fim
+    # (True) atende o código -1 dos buckets ausentes
+    invalid_by_code = np.append(~np.asarray(allowed_categories, dtype=bool), True)
+    mask_invalid_bucket = invalid_by_code[bucket_codes]
+    
+    if log_info:
+        _log_bucket_removals(df, bucket_col, start_col, due_col, categories,
+                             normalized_categories, mask_invalid_bucket)
+    
+    # Remover as datas dos buckets inválidos. Uma coluna de datas toda vazia
+    # chega como float64 e não aceita NaT: passar para object antes
+    for col in (start_col, due_col):
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype(object)
+    df.loc[mask_invalid_bucket, [start_col, due_col]] = pd.NaT
     
+    return df
+
+
+def _log_bucket_removals(df: pd.DataFrame,
+                         bucket_col: str,
+                         start_col: str,
+                         due_col: str,
+                         categories: pd.Index,
+                         normalized_categories: pd.Index,
+                         mask_invalid_bucket: np.ndarray) -> None:
+    """Registra quais buckets e quantas datas serão removidas (apenas log)."""
     # Log detalhado dos buckets que serão afetados
-    invalid_buckets_detail = df_copy.loc[mask_invalid_bucket, [bucket_col, 'bucket_normalized']].drop_duplicates()
-    if len(invalid_buckets_detail) > 0:
+    invalid_categories = ~normalized_categories.isin(PlannerConfig.ACTIVE_BUCKETS_NORMALIZED)
+    if invalid_categories.any():
         logging.info("Buckets que terão datas removidas:")
-        for _, row in invalid_buckets_detail.iterrows():
-            logging.info(f"  Original: '{row[bucket_col]}' -> Normalizado: '{row['bucket_normalized']}'")
+        for original, normalized in zip(categories[invalid_categories],
+                                        normalized_categories[invalid_categories]):
+            logging.info("  Original: '%s' -> Normalizado: '%s'", original, normalized)
     
     # Contar registros que serão afetados
-    invalid_with_start = mask_invalid_bucket & df_copy[start_col].notna()
-    invalid_with_due = mask_invalid_bucket & df_copy[due_col].notna()
-    
-    start_removals = invalid_with_start.sum()
-    due_removals = invalid_with_due.sum()
-    total_invalid_buckets = mask_invalid_bucket.sum()
+    start_removals = np.count_nonzero(mask_invalid_bucket & df[start_col].notna().to_numpy())
+    due_removals = np.count_nonzero(mask_invalid_bucket & df[due_col].notna().to_numpy())
+    total_invalid_buckets = np.count_nonzero(mask_invalid_bucket)
     
     if start_removals > 0 or due_removals > 0:
-        logging.info(f"Removendo datas de {total_invalid_buckets} registros com buckets não permitidos")
-        logging.info(f"  - {start_removals} datas de início removidas")
-        logging.info(f"  - {due_removals} datas de entrega removidas")
+        logging.info("Removendo datas de %d registros com buckets não permitidos", total_invalid_buckets)
+        logging.info("  - %d datas de início removidas", start_removals)
+        logging.info("  - %d datas de entrega removidas", due_removals)
         
         # Mostrar exemplos dos buckets problemáticos
-        invalid_buckets = df_copy.loc[mask_invalid_bucket, bucket_col].value_counts()
+        invalid_buckets = df.loc[mask_invalid_bucket, bucket_col].value_counts()
         logging.info("Buckets com datas removidas:")
         for bucket, count in invalid_buckets.items():
-            logging.info(f"  - '{bucket}': {count} registros")
+            logging.info("  - '%s': %d registros", bucket, count)
     else:
         logging.info("✅ Nenhuma data removida - todos os buckets estão permitidos")
-    
-    # Remover as datas dos buckets inválidos
-    df_copy.loc[mask_invalid_bucket, start_col] = pd.NaT
-    df_copy.loc[mask_invalid_bucket, due_col] = pd.NaT
-    
-    # Remover coluna temporária
-    df_copy = df_copy.drop(columns=['bucket_normalized'])
-    
-    return df_copy
 
 
 def mask_bucket_dates(df: pd.DataFrame, 
@@ -285,7 +462,8 @@ def create_backup_columns(df: pd.DataFrame) -> pd.DataFrame:
         DataFrame com colunas de backup
     """
     if 'Data de entrega' in df.columns:
-        df['Due_raw'] = df['Data de entrega'].astype(str)
+        # Categórica: valores repetidos compartilham uma única string
+        df['Due_raw'] = df['Data de entrega'].astype(STRING_DTYPE).astype('category')
     
     return df
 
@@ -310,38 +488,38 @@ def fill_missing_start_dates(df: pd.DataFrame,
         DataFrame com datas de início preenchidas
     """
     if start_col not in df.columns or due_col not in df.columns:
-        logging.warning(f"Colunas {start_col} ou {due_col} não encontradas. Pulando preenchimento de datas de início.")
+        logging.warning("Colunas %s ou %s não encontradas. Pulando preenchimento de datas de início.",
+                        start_col, due_col)
         return df
     
-    # Identificar registros que precisam de preenchimento
-    mask_has_due = df[due_col].notna()
-    mask_missing_start = df[start_col].isna()
-    mask_to_fill = mask_has_due & mask_missing_start
+    # Identificar registros que precisam de preenchimento (arrays datetime64)
+    due = df[due_col].to_numpy(dtype='datetime64[ns]')
+    start = df[start_col].to_numpy(dtype='datetime64[ns]')
+    mask_to_fill = np.isnat(start) & ~np.isnat(due)
     
-    records_to_fill = mask_to_fill.sum()
+    records_to_fill = int(np.count_nonzero(mask_to_fill))
     
     if records_to_fill == 0:
         logging.info("Nenhum registro precisa de data de início preenchida")
         return df
     
-    logging.info(f"Preenchendo data de início para {records_to_fill} registros")
-    logging.info(f"Regra: Data de início = Data de entrega - {days_before} dias")
+    logging.info("Preenchendo data de início para %d registros", records_to_fill)
+    logging.info("Regra: Data de início = Data de entrega - %d dias", days_before)
     
-    # Calcular novas datas de início
-    df.loc[mask_to_fill, start_col] = df.loc[mask_to_fill, due_col] - pd.Timedelta(days=days_before)
+    # Calcular novas datas de início em uma única atribuição
+    df[start_col] = np.where(mask_to_fill, due - np.timedelta64(days_before, 'D'), start)
     
-    # Log de alguns exemplos
-    if records_to_fill > 0:
+    # Log de alguns exemplos (só monta a amostra se DEBUG estiver ativo)
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
         sample_data = df.loc[mask_to_fill, ['Título', start_col, due_col]].head(3)
         logging.debug("Exemplos de datas preenchidas:")
-        for idx, row in sample_data.iterrows():
-            logging.debug(f"  '{row['Título']}': Início={row[start_col].strftime('%d/%m/%Y')} "
-                         f"-> Entrega={row[due_col].strftime('%d/%m/%Y')}")
+        for title, start_date, due_date in sample_data.itertuples(index=False, name=None):
+            logging.debug("  '%s': Início=%s -> Entrega=%s", title,
+                          start_date.strftime('%d/%m/%Y'), due_date.strftime('%d/%m/%Y'))
     
-    # Validar se as datas calculadas fazem sentido
-    invalid_dates = df.loc[mask_to_fill, start_col] > df.loc[mask_to_fill, due_col]
-    if invalid_dates.any():
-        logging.warning(f"ATENÇÃO: {invalid_dates.sum()} datas de início ficaram posteriores à entrega!")
+    # Início = entrega - days_before: só fica posterior à entrega se days_before < 0
+    if days_before < 0:
+        logging.warning("ATENÇÃO: %d datas de início ficaram posteriores à entrega!", records_to_fill)
     
     return df
 
@@ -353,22 +531,32 @@ def log_processing_stats(df: pd.DataFrame) -> None:
     Args:
         df: DataFrame para analisar
     """
+    # Tudo aqui é apenas log: não calcular nada se INFO estiver desligado
+    if not logging.getLogger().isEnabledFor(logging.INFO):
+        return
+    
     total_rows = len(df)
     
     if 'Bucket' in df.columns:
-        bucket_counts = df['Bucket'].str.strip().str.lower().value_counts()
-        logging.info(f"Distribuição por bucket:")
+        # Contar os valores brutos e normalizar (strip + lower) só os distintos
+        raw_counts = df['Bucket'].value_counts()
+        bucket_counts = (raw_counts
+                         .groupby(raw_counts.index.str.strip().str.lower())
+                         .sum()
+                         .sort_values(ascending=False))
+        logging.info("Distribuição por bucket:")
         for bucket, count in bucket_counts.items():
-            logging.info(f"  {bucket}: {count} registros")
+            logging.info("  %s: %d registros", bucket, count)
     
     # Estatísticas de datas
     date_columns = ['Data de início', 'Data de entrega', 'Data de conclusão']
     for col in date_columns:
         if col in df.columns:
             filled_count = df[col].notna().sum()
-            logging.info(f"  {col}: {filled_count}/{total_rows} preenchidas ({filled_count/total_rows*100:.1f}%)")
+            logging.info("  %s: %d/%d preenchidas (%.1f%%)",
+                         col, filled_count, total_rows, filled_count / total_rows * 100)
     
-    logging.info(f"Total de registros processados: {total_rows}")
+    logging.info("Total de registros processados: %d", total_rows)
 
 
 def generate_output_filename(output_dir: Path, 
@@ -397,7 +585,7 @@ def save_dataframe(df: pd.DataFrame, output_path: Path) -> None:
         output_path: Caminho do arquivo de saída
     """
     try:
-        df.to_excel(output_path, index=False, engine='openpyxl')
+        df.to_excel(output_path, index=False, engine=EXCEL_WRITER)
         logging.info(f"Arquivo salvo com sucesso: {output_path.name}")
         
     except Exception as e:
@@ -405,13 +593,151 @@ def save_dataframe(df: pd.DataFrame, output_path: Path) -> None:
         raise
 
 
-def main(input_path: Path, output_dir: Path) -> Optional[Path]:
+def get_cache_path(input_path: Path, output_dir: Path) -> Path:
+    """
+    Retorna o caminho do cache do resultado para este arquivo de entrada.
+    
+    A chave combina o conteúdo do arquivo, as configurações de PlannerConfig,
+    as versões do pandas/numpy, as engines de leitura e o código do
+    pipeline/parser: qualquer mudança gera uma chave nova.
+    
+    Args:
+        input_path: Caminho do arquivo de entrada
+        output_dir: Diretório de saída
+        
+    Returns:
+        Caminho do arquivo de cache (pode ainda não existir)
+    """
+    digest = hashlib.sha256()
+    with open(input_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    
+    settings = (PlannerConfig.COLUMN_MAPPING, PlannerConfig.TEXT_COLUMNS,
+                PlannerConfig.ACTIVE_BUCKETS, PlannerConfig.DATE_COLUMNS,
+                PlannerConfig.DEFAULT_ASSIGNEE, PlannerConfig.START_DATE_FILL_DAYS)
+    digest.update(repr(settings).encode('utf-8'))
+    
+    # Versões e engines mudam o DataFrame lido e o formato do pickle
+    environment = (pd.__version__, np.__version__, EXCEL_ENGINE, STRING_DTYPE)
+    digest.update(repr(environment).encode('utf-8'))
+    
+    for source_file in _SOURCE_FILES:
+        digest.update(source_file.read_bytes())
+    
+    return output_dir / PlannerConfig.CACHE_DIR_NAME / f"{digest.hexdigest()}.pkl"
+
+
+def load_cached_result(cache_path: Path) -> Optional[pd.DataFrame]:
+    """
+    Lê o resultado guardado em cache, se existir e estiver íntegro.
+    
+    O cache é um pickle gravado pelo próprio pipeline no diretório de saída;
+    um arquivo corrompido (ex.: execução interrompida) é descartado.
+    
+    Args:
+        cache_path: Caminho retornado por get_cache_path
+        
+    Returns:
+        DataFrame processado ou None se não houver cache utilizável
+    """
+    if not cache_path.exists():
+        return None
+    
+    try:
+        df = pd.read_pickle(cache_path)
+    except Exception as e:
+        logging.warning(f"Cache inválido, processando novamente: {cache_path.name} ({e})")
+        try:
+            cache_path.unlink()
+        except OSError as unlink_error:
+            logging.warning(f"Não foi possível remover o cache inválido: {unlink_error}")
+        return None
+    
+    return df
+
+
+def store_cached_result(df: pd.DataFrame, cache_path: Path) -> None:
+    """
+    Grava o resultado no cache sem interromper o pipeline em caso de erro.
+    
+    O pickle é escrito em um arquivo temporário e movido para o destino com
+    os.replace, de modo que o cache nunca fica com um arquivo pela metade.
+    
+    Args:
+        df: DataFrame processado
+        cache_path: Caminho retornado por get_cache_path
+    """
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(exist_ok=True, parents=True)
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logging.warning(f"Não foi possível gravar o cache {cache_path.name}: {e}")
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def transform(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica limpeza e transformações a um DataFrame já carregado e validado.
+    
+    Args:
+        df: DataFrame com colunas renomeadas (arquivo inteiro ou um bloco)
+        
+    Returns:
+        DataFrame transformado
+    """
+    # Limpeza inicial
+    df = clean_string_columns(df)
+    
+    # Backup para debug
+    df = create_backup_columns(df)
+    
+    # Pipeline de transformações usando method chaining
+    logging.info("Aplicando transformações...")
+    
+    return (df
+            .pipe(fill_default_values)
+            .pipe(
+                validate_dates_by_bucket,
+                bucket_col='Bucket'
+            )
+            .pipe(
+                parse_dates,
+                date_cols=PlannerConfig.DATE_COLUMNS,
+                inplace=True
+            )
+            .pipe(
+                fill_missing_start_dates,
+                start_col='Data de início',
+                due_col='Data de entrega',
+                days_before=PlannerConfig.START_DATE_FILL_DAYS
+            )
+            .pipe(
+                debug_missing_due,
+                bucket_col='Bucket',
+                due_raw_col='Due_raw',
+                due_parsed_col='Data de entrega'
+            ))
+
+
+def main(input_path: Path, output_dir: Path, chunk_size: Optional[int] = None,
+         use_cache: bool = False) -> Optional[Path]:
     """
     Função principal do pipeline de processamento.
     
     Args:
         input_path: Caminho do arquivo de entrada
         output_dir: Diretório de saída
+        chunk_size: Se informado, lê e transforma o arquivo em blocos com
+                    essa quantidade de linhas (ex.: PlannerConfig.CHUNK_SIZE)
+        use_cache: Se True, reaproveita o resultado de uma execução anterior
+                   com o mesmo arquivo e a mesma configuração (guardado em
+                   output_dir/.cache); desligado por padrão
         
     Returns:
         Caminho do arquivo de saída gerado ou None em caso de erro
@@ -422,43 +748,34 @@ def main(input_path: Path, output_dir: Path) -> Optional[Path]:
     try:
         logging.info("Iniciando pipeline de processamento")
         
-        # 1. Carregamento e renomeação
-        df = load_and_rename(input_path)
+        cache_path = get_cache_path(input_path, output_dir) if use_cache else None
+        
+        # Mesmo arquivo e mesma configuração: pular o processamento
+        df = load_cached_result(cache_path) if cache_path is not None else None
+        cache_hit = df is not None
+        
+        if cache_hit:
+            logging.info(f"Arquivo já processado anteriormente, usando cache: {cache_path.name}")
+        elif chunk_size:
+            # 1-5. Carregamento, validação e transformações bloco a bloco
+            parts = []
+            for chunk in iter_chunks(input_path, chunk_size):
+                validate_required_columns(chunk)
+                parts.append(transform(chunk))
+            df = pd.concat(parts, copy=False)
+            logging.info(f"Blocos processados: {len(parts)}, {len(df)} linhas")
+        else:
+            # 1. Carregamento e renomeação
+            df = load_and_rename(input_path)
+            
+            # 2. Validações
+            validate_required_columns(df)
+            
+            # 3-5. Limpeza, backup e transformações
+            df = transform(df)
         
-        # 2. Validações
-        validate_required_columns(df)
-        
-        # 3. Limpeza inicial
-        df = clean_string_columns(df)
-        
-        # 4. Backup para debug
-        df = create_backup_columns(df)
-        
-        # 5. Pipeline de transformações usando method chaining
-        logging.info("Aplicando transformações...")
-        
-        df = (df
-              .pipe(fill_default_values)
-              .pipe(
-                  validate_dates_by_bucket,
-                  bucket_col='Bucket'
-              )
-              .pipe(
-                  parse_dates,
-                  date_cols=PlannerConfig.DATE_COLUMNS
-              )
-              .pipe(
-                  fill_missing_start_dates,
-                  start_col='Data de início',
-                  due_col='Data de entrega',
-                  days_before=PlannerConfig.START_DATE_FILL_DAYS
-              )
-              .pipe(
-                  debug_missing_due,
-                  bucket_col='Bucket',
-                  due_raw_col='Due_raw',
-                  due_parsed_col='Data de entrega'
-              ))
+        if cache_path is not None and not cache_hit:
+            store_cached_result(df, cache_path)
         
         # 6. Estatísticas e logs
         log_processing_stats(df)
@@ -5,63 +5,142 @@ Este script coordena o processamento de arquivos Excel exportados do Planner,
 aplicando transformações e gerando arquivos de saída organizados.
 """
 
+import fnmatch
+import os
+import re
+import stat
 import sys
 import logging
-import pandas as pd
+import logging.handlers
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-import pipeline
-import test_validation
+# pipeline e test_validation (pandas, openpyxl, numpy...) são importados
+# dentro de main(), para que --help e erros de argumento respondam rápido
+
+
+# Diretório base do projeto
+BASE_DIR = Path(r"C:\Users\artur.almeida\Documents\progs\PowerBi_Projetos")
+
+# Extensões aceitas para o arquivo de entrada
+EXCEL_EXTENSIONS = frozenset({'.xlsx', '.xls'})
+
+# Padrões de nomes de arquivo do Planner
+PLANNER_PATTERNS = (
+    "Gerenciamento de Projetos*.xlsx",
+    "Gerenciamento de Projetos*.xls",
+    "TarefasPlanner*.xlsx",
+    "TarefasPlanner*.xls",
+)
+
+# Todos os padrões em uma única regex, compilada na importação
+# (sem distinção de maiúsculas no Windows, como o glob)
+_PLANNER_RE = re.compile(
+    "|".join(fnmatch.translate(pattern) for pattern in PLANNER_PATTERNS),
+    re.IGNORECASE if os.name == 'nt' else 0
+)
+
+
+@dataclass
+class PlannerFile:
+    """Arquivo de entrada escolhido para o processamento."""
+    path: Path
+    mtime: float
+    discovered: bool = False  # True se veio da busca automática (padrões já garantem a extensão)
+
+
+# Indica se setup_logging já configurou o logging neste processo
+_LOGGING_CONFIGURED = False
+
+
+@lru_cache(maxsize=32)
+def _ensure_dir(path: str) -> bool:
+    """Cria o diretório (e os pais) uma única vez por caminho no processo."""
+    Path(path).mkdir(exist_ok=True, parents=True)
+    return True
 
 
 def setup_logging(base_dir: Path) -> None:
     """
     Configura o sistema de logging.
     
+    Chamadas seguintes no mesmo processo (ex.: main() executado várias vezes)
+    não fazem nada: os handlers e o arquivo de log da primeira são mantidos.
+    
     Args:
         base_dir: Diretório base do projeto para criar pasta logs
     """
+    global _LOGGING_CONFIGURED
+    if _LOGGING_CONFIGURED:
+        return
+    _LOGGING_CONFIGURED = True
+    
     # Criar pasta logs se não existir
     logs_dir = base_dir / "logs"
-    logs_dir.mkdir(exist_ok=True, parents=True)
+    _ensure_dir(str(logs_dir))
     
     # Nome do arquivo de log com timestamp
-    timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = logs_dir / f"processar_planner_{timestamp}.log"
     
+    # Arquivo aberto só na primeira escrita; as linhas são acumuladas em
+    # memória e gravadas em lote (ou imediatamente a partir de WARNING).
+    # O logging.shutdown do fim do processo descarrega o que restar.
+    log_format = '%(asctime)s - %(levelname)s - %(message)s'
+    file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
+    file_handler.setFormatter(logging.Formatter(log_format))
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.WARNING,
+        target=file_handler
+    )
+    
     # Configurar logging
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
+        format=log_format,
         handlers=[
             logging.StreamHandler(sys.stdout),
-            logging.FileHandler(log_file, encoding='utf-8')
+            buffered_handler
         ]
     )
 
 
-def validate_paths(input_path: Path, output_dir: Path) -> bool:
+def validate_paths(input_path: Path, output_dir: Path, discovered: bool = False) -> bool:
     """
     Valida se os caminhos de entrada e saída são válidos.
     
     Args:
         input_path: Caminho do arquivo de entrada
         output_dir: Diretório de saída
+        discovered: Se True, o arquivo veio de find_latest_planner_file e a
+                    extensão já foi garantida pelos padrões de busca
         
     Returns:
         True se todos os caminhos são válidos, False caso contrário
     """
-    if not input_path.exists():
+    # Um único stat responde existência e tipo do arquivo
+    try:
+        input_stat = os.stat(input_path)
+    except (OSError, ValueError):
+        # Inclui caminho inválido (ex.: byte nulo), arquivo no meio do caminho
+        # e falta de permissão, casos em que Path.exists() responderia False
         logging.error(f"Arquivo de entrada não encontrado: {input_path}")
         return False
     
-    if not input_path.suffix.lower() in ['.xlsx', '.xls']:
+    if not stat.S_ISREG(input_stat.st_mode):
+        logging.error(f"Caminho de entrada não é um arquivo: {input_path}")
+        return False
+    
+    if not discovered and input_path.suffix.lower() not in EXCEL_EXTENSIONS:
         logging.error(f"Arquivo deve ser Excel (.xlsx ou .xls): {input_path}")
         return False
     
     try:
-        output_dir.mkdir(exist_ok=True, parents=True)
+        _ensure_dir(str(output_dir))
         logging.info(f"Diretório de saída criado/validado: {output_dir}")
     except Exception as e:
         logging.error(f"Erro ao criar diretório de saída {output_dir}: {e}")
@@ -70,7 +149,7 @@ def validate_paths(input_path: Path, output_dir: Path) -> bool:
     return True
 
 
-def find_latest_planner_file(input_dir: Path) -> Optional[Path]:
+def find_latest_planner_file(input_dir: Path) -> Optional[PlannerFile]:
     """
     Procura pelo arquivo Excel mais recente do Planner no diretório.
     
@@ -81,60 +160,64 @@ def find_latest_planner_file(input_dir: Path) -> Optional[Path]:
         input_dir: Diretório onde procurar os arquivos
         
     Returns:
-        Caminho do arquivo mais recente encontrado ou None
+        PlannerFile do arquivo mais recente encontrado ou None
     """
-    # Padrões de nomes de arquivo do Planner
-    patterns = [
-        "Gerenciamento de Projetos*.xlsx",
-        "Gerenciamento de Projetos*.xls", 
-        "TarefasPlanner*.xlsx",
-        "TarefasPlanner*.xls"
-    ]
-    
-    all_files = []
-    
-    # Buscar arquivos com todos os padrões
-    for pattern in patterns:
-        files = list(input_dir.glob(pattern))
-        all_files.extend(files)
+    # Uma única varredura do diretório cobre todos os padrões; o mais recente
+    # é escolhido durante a própria varredura, com o stat do DirEntry
+    latest_file = None
+    latest_mtime = -1.0
+    found_count = 0
+    try:
+        with os.scandir(input_dir) as entries:
+            for entry in entries:
+                if _PLANNER_RE.match(entry.name) and entry.is_file():
+                    found_count += 1
+                    mtime = entry.stat().st_mtime
+                    if mtime > latest_mtime:
+                        latest_mtime, latest_file = mtime, entry.path
+    except (FileNotFoundError, NotADirectoryError):
+        # Pasta de entrada inexistente: mesmo tratamento de "nenhum arquivo"
+        pass
     
-    if not all_files:
+    if latest_file is None:
         logging.error("Nenhum arquivo do Planner encontrado no diretório de entrada")
         logging.info("Padrões procurados:")
-        for pattern in patterns:
+        for pattern in PLANNER_PATTERNS:
             logging.info(f"  - {pattern}")
         return None
     
-    # Ordenar por data de modificação (mais recente primeiro)
-    latest_file = max(all_files, key=lambda f: f.stat().st_mtime)
+    latest = PlannerFile(path=Path(latest_file), mtime=latest_mtime, discovered=True)
     
-    logging.info(f"Arquivo encontrado: {latest_file.name}")
+    logging.info(f"Arquivo encontrado: {latest.path.name}")
     
     # Se há múltiplos arquivos, avisar
-    if len(all_files) > 1:
-        logging.info(f"Múltiplos arquivos encontrados ({len(all_files)}), usando o mais recente")
+    if found_count > 1:
+        logging.info(f"Múltiplos arquivos encontrados ({found_count}), usando o mais recente")
         
-    return latest_file
+    return latest
 
 
+@lru_cache(maxsize=1)
 def get_config() -> dict:
     """
     Retorna a configuração de caminhos do projeto.
     
+    Os caminhos são montados uma única vez por processo; o mesmo dicionário
+    é devolvido nas chamadas seguintes (não deve ser alterado).
+    
     Returns:
         Dicionário com os caminhos configurados
     """
-    base_dir = Path(r"C:\Users\artur.almeida\Documents\progs\PowerBi_Projetos")
-    
     return {
-        'base_dir': base_dir,
-        'input_dir': base_dir / "inputs",
-        'output_dir': base_dir / "outputs",
+        'base_dir': BASE_DIR,
+        'input_dir': BASE_DIR / "inputs",
+        'output_dir': BASE_DIR / "outputs",
         # Removido input_file fixo - será detectado automaticamente
     }
 
 
-def main(input_filename: Optional[str] = None, run_validation: bool = True) -> None:
+def main(input_filename: Optional[str] = None, run_validation: bool = True,
+         use_cache: bool = False) -> None:
     """
     Função principal do processamento.
     
@@ -144,6 +227,8 @@ def main(input_filename: Optional[str] = None, run_validation: bool = True) -> N
                        - "Gerenciamento de Projetos*.xlsx"
                        - "TarefasPlanner*.xlsx"
         run_validation: Se True, executa validação após processamento
+        use_cache: Se True, reaproveita o resultado de uma execução anterior
+                   com o mesmo arquivo (pasta outputs/.cache)
     """
     # Carregar configuração primeiro
     config = get_config()
@@ -155,32 +240,36 @@ def main(input_filename: Optional[str] = None, run_validation: bool = True) -> N
     
     try:
         # Buscar arquivo automaticamente ou usar o especificado
+        discovered = False
         if input_filename:
             # Arquivo específico fornecido via linha de comando
+            # (existência verificada em validate_paths)
             input_path = config['input_dir'] / input_filename
-            if not input_path.exists():
-                logging.error(f"Arquivo especificado não encontrado: {input_filename}")
-                sys.exit(1)
         else:
             # Busca automática pelo arquivo mais recente
-            input_path = find_latest_planner_file(config['input_dir'])
-            if input_path is None:
+            planner_file = find_latest_planner_file(config['input_dir'])
+            if planner_file is None:
                 logging.error("Nenhum arquivo do Planner encontrado para processar")
                 sys.exit(1)
+            input_path = planner_file.path
+            discovered = planner_file.discovered
         
         output_dir = config['output_dir']
         
         # Validar caminhos
-        if not validate_paths(input_path, output_dir):
+        if not validate_paths(input_path, output_dir, discovered=discovered):
             logging.error("Validação de caminhos falhou. Encerrando processamento.")
             sys.exit(1)
         
         # Executar pipeline
-        output_file = pipeline.main(input_path=input_path, output_dir=output_dir)
+        import pipeline
+        output_file = pipeline.main(input_path=input_path, output_dir=output_dir,
+                                    use_cache=use_cache)
         
         # Executar validação se solicitado
         if run_validation and output_file:
             logging.info("Iniciando validação dos resultados...")
+            import test_validation
             validation_passed = test_validation.main(input_path, output_file)
             
             if validation_passed:
@@ -200,17 +289,7 @@ def main(input_filename: Optional[str] = None, run_validation: bool = True) -> N
 
 
 if __name__ == "__main__":
-    # Processar argumentos da linha de comando
-    import argparse
-    
-    parser = argparse.ArgumentParser(description="Processador de arquivos do Planner")
-    parser.add_argument("arquivo", nargs="?", help="Nome do arquivo específico (opcional)")
-    parser.add_argument("--no-validation", action="store_true", 
-                       help="Pular validação após processamento")
-    parser.add_argument("--help-extended", action="store_true",
-                       help="Mostrar ajuda detalhada")
-    
-    # Parse argumentos ou usar sys.argv se preferir o método antigo
+    # Ajuda tratada antes de qualquer configuração (logging, pastas, imports)
     if len(sys.argv) > 1 and sys.argv[1] in ["--help", "-h", "--help-extended"]:
         if "--help-extended" in sys.argv:
             print("="*60)
@@ -222,6 +301,7 @@ if __name__ == "__main__":
             print("  python processar_planner.py arquivo.xlsx       # Arquivo específico + validação")
             print("  python processar_planner.py --no-validation    # Sem validação")
             print("  python processar_planner.py arquivo.xlsx --no-validation")
+            print("  python processar_planner.py --cache            # Reaproveita resultado anterior")
             print()
             print("BUSCA AUTOMÁTICA:")
             print("  O script procura automaticamente por:")
@@ -236,23 +316,40 @@ if __name__ == "__main__":
             print("  - Confirma integridade dos dados")
             print("  - Gera relatório detalhado")
             print()
+            print("CACHE:")
+            print("  Com --cache, o resultado é guardado em outputs/.cache e")
+            print("  reaproveitado enquanto o arquivo e o código não mudarem")
+            print()
             print("EXEMPLOS:")
             print("  python processar_planner.py")
             print("  python processar_planner.py \"Gerenciamento de Projetos (2).xlsx\"")
             print("  python processar_planner.py --no-validation")
             print("="*60)
         else:
+            import argparse
+            
+            parser = argparse.ArgumentParser(description="Processador de arquivos do Planner")
+            parser.add_argument("arquivo", nargs="?", help="Nome do arquivo específico (opcional)")
+            parser.add_argument("--no-validation", action="store_true", 
+                               help="Pular validação após processamento")
+            parser.add_argument("--cache", action="store_true",
+                               help="Reaproveitar o resultado de uma execução anterior")
+            parser.add_argument("--help-extended", action="store_true",
+                               help="Mostrar ajuda detalhada")
             parser.print_help()
         sys.exit(0)
     
     # Método simples para compatibilidade
     input_file = None
     run_validation = True
+    use_cache = False
     
     for arg in sys.argv[1:]:
         if arg == "--no-validation":
             run_validation = False
+        elif arg == "--cache":
+            use_cache = True
         elif not arg.startswith("--"):
             input_file = arg
     
-    main(input_filename=input_file, run_validation=run_validation)
\ No newline at end of file
+    main(input_filename=input_file, run_validation=run_validation, use_cache=use_cache)
\ No newline at end of file
@@ -8,12 +8,66 @@ Este módulo compara arquivos de entrada e saída para identificar:
 - Estatísticas de transformação
 """
 
+from __future__ import annotations
+
 import logging
-import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
-import numpy as np
+from functools import lru_cache
+
+# pandas, numpy e pyarrow são importados dentro das funções que os usam,
+# para que erros de argumento da linha de comando respondam rápido
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+try:
+    import python_calamine  # noqa: F401
+    # Leitor em Rust: a validação só lê as planilhas, nunca escreve
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+
+@lru_cache(maxsize=1)
+def _arrow_compute():
+    """Importa o pyarrow na primeira chamada; None se não estiver instalado."""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        return None
+    return pa, pc
+
+# Todas as colunas consultadas pelas validações (incluindo os nomes
+# alternativos de ID e de datas); as demais não são lidas
+NEEDED_COLUMNS = frozenset({
+    'ID da Tarefa', 'Identificação da tarefa', 'ID', 'Task ID',
+    'Bucket',
+    'Data de criação', 'Criado em', 'Created Date',
+    'Data de início', 'Start Date',
+    'Data de entrega', 'Data de conclusão', 'Due Date',
+})
+
+
+def _values_not_in(values: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """
+    Retorna os elementos de values que não aparecem em reference.
+    
+    Ambos os arrays devem estar sem repetições. Com pyarrow, usa o kernel
+    de hash is_in; sem ele, np.isin.
+    """
+    import numpy as np
+    
+    if not len(values) or not len(reference):
+        return values
+    arrow = _arrow_compute()
+    if arrow is not None:
+        pa, pc = arrow
+        found = pc.is_in(pa.array(values), value_set=pa.array(reference))
+        return values[~found.to_numpy(zero_copy_only=False)]
+    return values[~np.isin(values, reference, assume_unique=True)]
 
 
 @dataclass
@@ -29,6 +83,9 @@ class ValidationResult:
 class PlannerValidator:
     """Classe principal para validação do pipeline do Planner."""
     
+    # Colunas de data acompanhadas nas validações e estatísticas
+    DATE_COLUMNS = ('Data de início', 'Data de entrega', 'Data de conclusão')
+    
     def __init__(self, input_file: Path, output_file: Path):
         """
         Inicializa o validador.
@@ -41,8 +98,54 @@ class PlannerValidator:
         self.output_file = output_file
         self.input_df = None
         self.output_df = None
+        self.input_columns: List[str] = []
+        self.output_columns: List[str] = []
+        # Bucket de saída normalizado (strip + lower) como categórico
+        self.output_bucket: Optional[pd.Series] = None
+        # Cache do arquivo de saída: total de linhas e máscaras de datas preenchidas
+        self._n_out = 0
+        self._date_filled: Dict[str, np.ndarray] = {}
         self.results: List[ValidationResult] = []
         
+    @staticmethod
+    def _read_needed_columns(file_path: Path) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        Lê do arquivo apenas as colunas usadas nas validações.
+        
+        O arquivo é aberto uma única vez (pd.ExcelFile) para ler o cabeçalho
+        e depois os dados.
+        
+        Returns:
+            Tupla (DataFrame com as colunas usadas, lista com todas as colunas)
+        """
+        import pandas as pd
+        
+        with pd.ExcelFile(file_path, engine=EXCEL_ENGINE) as xl:
+            all_columns = list(xl.parse(nrows=0).columns)
+            needed = [col for col in all_columns if col in NEEDED_COLUMNS]
+            # Sem colunas conhecidas: ler tudo para manter a contagem de linhas
+            df = xl.parse(usecols=needed or None)
+        return PlannerValidator._optimize_dtypes(df), all_columns
+    
+    @staticmethod
+    def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reduz os tipos das colunas para diminuir a memória percorrida nas validações.
+        
+        Inteiros e floats são rebaixados para o menor tipo que comporta os
+        valores; colunas de texto com muitos valores repetidos viram category.
+        """
+        import pandas as pd
+        
+        for col in df.select_dtypes(include='integer').columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        for col in df.select_dtypes(include='float').columns:
+            df[col] = pd.to_numeric(df[col], downcast='float')
+        for col in df.select_dtypes(include='object').columns:
+            if len(df) and df[col].nunique() / len(df) < 0.5:
+                df[col] = df[col].astype('category')
+        return df
+    
     def load_files(self) -> bool:
         """
         Carrega os arquivos de entrada e saída.
@@ -54,13 +157,31 @@ class PlannerValidator:
             logging.info("Carregando arquivos para validação...")
             
             # Carregar arquivo de entrada
-            self.input_df = pd.read_excel(self.input_file)
+            self.input_df, self.input_columns = self._read_needed_columns(self.input_file)
             logging.info(f"Arquivo de entrada: {len(self.input_df)} linhas")
             
             # Carregar arquivo de saída
-            self.output_df = pd.read_excel(self.output_file)
+            self.output_df, self.output_columns = self._read_needed_columns(self.output_file)
             logging.info(f"Arquivo de saída: {len(self.output_df)} linhas")
             
+            # Normalizar o bucket uma única vez: as comparações passam a ser
+            # entre códigos de categoria, sem refazer strip/lower por filtro
+            if 'Bucket' in self.output_df.columns:
+                self.output_bucket = (self.output_df['Bucket']
+                                      .astype('string')
+                                      .str.strip()
+                                      .str.lower()
+                                      .astype('category'))
+            
+            # Total de linhas e notna das colunas de data calculados uma vez,
+            # reaproveitados pelas validações e pelas estatísticas
+            self._n_out = len(self.output_df)
+            self._date_filled = {
+                col: self.output_df[col].notna().to_numpy()
+                for col in self.DATE_COLUMNS
+                if col in self.output_df.columns
+            }
+            
             return True
             
         except Exception as e:
@@ -70,7 +191,7 @@ class PlannerValidator:
     def validate_row_count(self) -> ValidationResult:
         """Valida se o número de linhas foi preservado."""
         input_rows = len(self.input_df)
-        output_rows = len(self.output_df)
+        output_rows = self._n_out
         
         if input_rows == output_rows:
             return ValidationResult(
@@ -90,6 +211,8 @@ class PlannerValidator:
     
     def validate_unique_ids(self) -> ValidationResult:
         """Valida se IDs únicos foram preservados."""
+        import numpy as np
+        
         # Tentar encontrar coluna de ID
         id_columns = ['ID da Tarefa', 'Identificação da tarefa', 'ID', 'Task ID']
         id_col = None
@@ -118,13 +241,15 @@ class PlannerValidator:
                 severity="ERROR"
             )
         
-        input_ids = set(self.input_df[id_col].dropna().astype(str))
-        output_ids = set(self.output_df[output_id_col].dropna().astype(str))
+        # IDs distintos como arrays ordenados; a comparação é feita em bloco
+        # (pyarrow is_in ou np.isin) em vez de conjuntos Python
+        input_ids = np.unique(self.input_df[id_col].dropna().astype(str).to_numpy())
+        output_ids = np.unique(self.output_df[output_id_col].dropna().astype(str).to_numpy())
         
-        missing_ids = input_ids - output_ids
-        extra_ids = output_ids - input_ids
+        missing_ids = _values_not_in(input_ids, output_ids)
+        extra_ids = _values_not_in(output_ids, input_ids)
         
-        if not missing_ids and not extra_ids:
+        if not len(missing_ids) and not len(extra_ids):
             return ValidationResult(
                 test_name="IDs Únicos",
                 passed=True,
@@ -133,9 +258,9 @@ class PlannerValidator:
             )
         else:
             issues = []
-            if missing_ids:
+            if len(missing_ids):
                 issues.append(f"{len(missing_ids)} IDs perdidos")
-            if extra_ids:
+            if len(extra_ids):
                 issues.append(f"{len(extra_ids)} IDs novos")
             
             return ValidationResult(
@@ -143,8 +268,8 @@ class PlannerValidator:
                 passed=False,
                 message=f"❌ Problemas com IDs: {', '.join(issues)}",
                 details={
-                    "missing_ids": list(missing_ids)[:10],  # Primeiros 10
-                    "extra_ids": list(extra_ids)[:10],
+                    "missing_ids": missing_ids[:10].tolist(),  # Primeiros 10
+                    "extra_ids": extra_ids[:10].tolist(),
                     "missing_count": len(missing_ids),
                     "extra_count": len(extra_ids)
                 },
@@ -162,6 +287,8 @@ class PlannerValidator:
         issues = []
         date_stats = {}
         
+        # Resolver os pares (coluna de entrada, coluna de saída) primeiro
+        column_pairs = []
         for output_col, possible_input_cols in date_columns.items():
             # Encontrar coluna correspondente no input
             input_col = None
@@ -170,12 +297,16 @@ class PlannerValidator:
                     input_col = col
                     break
             
-            if not input_col or output_col not in self.output_df.columns:
-                continue
-            
-            # Contar datas válidas
-            input_valid = self.input_df[input_col].notna().sum()
-            output_valid = self.output_df[output_col].notna().sum()
+            if input_col and output_col in self.output_df.columns:
+                column_pairs.append((input_col, output_col))
+        
+        # Contar datas válidas de todas as colunas em uma redução por arquivo
+        input_counts = self.input_df[[i for i, _ in column_pairs]].count()
+        output_counts = self.output_df[[o for _, o in column_pairs]].count()
+        
+        for input_col, output_col in column_pairs:
+            input_valid = input_counts[input_col]
+            output_valid = output_counts[output_col]
             
             date_stats[output_col] = {
                 'input_valid': input_valid,
@@ -227,27 +358,30 @@ class PlannerValidator:
         
         bucket_issues = []
         
+        # Total de registros e de datas preenchidas por bucket em um único groupby
+        # (só as colunas de data presentes; as ausentes não são contadas)
+        date_cols = [col for col in ('Data de início', 'Data de entrega')
+                     if col in self.output_df.columns]
+        grouped = self.output_df[date_cols].groupby(self.output_bucket, observed=True)
+        bucket_sizes = grouped.size()
+        filled_by_bucket = grouped.count()
+        
         # Verificar buckets inválidos com datas
         for bucket in invalid_buckets:
-            mask = self.output_df['Bucket'].str.strip().str.lower() == bucket
-            bucket_data = self.output_df[mask]
-            
-            if len(bucket_data) > 0:
-                invalid_start = bucket_data['Data de início'].notna().sum()
-                invalid_due = bucket_data['Data de entrega'].notna().sum()
-                
-                if invalid_start > 0:
-                    bucket_issues.append(f"'{bucket}' tem {invalid_start} datas de início")
-                if invalid_due > 0:
-                    bucket_issues.append(f"'{bucket}' tem {invalid_due} datas de entrega")
+            if bucket in bucket_sizes.index:
+                if 'Data de início' in filled_by_bucket.columns:
+                    invalid_start = filled_by_bucket.at[bucket, 'Data de início']
+                    if invalid_start > 0:
+                        bucket_issues.append(f"'{bucket}' tem {invalid_start} datas de início")
+                if 'Data de entrega' in filled_by_bucket.columns:
+                    invalid_due = filled_by_bucket.at[bucket, 'Data de entrega']
+                    if invalid_due > 0:
+                        bucket_issues.append(f"'{bucket}' tem {invalid_due} datas de entrega")
         
         # Verificar se buckets válidos não perderam datas importantes
-        exec_mask = self.output_df['Bucket'].str.strip().str.lower() == 'execução'
-        exec_data = self.output_df[exec_mask]
-        
-        if len(exec_data) > 0:
-            missing_due = exec_data['Data de entrega'].isna().sum()
-            total_exec = len(exec_data)
+        if 'execução' in bucket_sizes.index and 'Data de entrega' in filled_by_bucket.columns:
+            total_exec = bucket_sizes['execução']
+            missing_due = total_exec - filled_by_bucket.at['execução', 'Data de entrega']
             
             if missing_due > total_exec * 0.3:  # Mais de 30% sem data de entrega
                 bucket_issues.append(f"Execução: {missing_due}/{total_exec} sem data de entrega ({missing_due/total_exec*100:.1f}%)")
@@ -269,37 +403,64 @@ class PlannerValidator:
     
     def validate_data_consistency(self) -> ValidationResult:
         """Valida consistência dos dados (datas lógicas, etc.)."""
+        import numpy as np
+        import pandas as pd
+        
         issues = []
         
+        # Cada coluna de data datetime64 é convertida para array uma única vez;
+        # o mesmo array serve à comparação início/entrega e aos limites de ano
+        # (comparações com NaT no NumPy são sempre falsas)
+        date_cols = ['Data de início', 'Data de entrega', 'Data de conclusão']
+        date_values = {
+            col: self.output_df[col].to_numpy(dtype='datetime64[ns]')
+            for col in date_cols
+            if col in self.output_df.columns
+            and pd.api.types.is_datetime64_dtype(self.output_df[col])
+        }
+        
         # Verificar datas de início após datas de entrega
         if 'Data de início' in self.output_df.columns and 'Data de entrega' in self.output_df.columns:
-            both_dates = self.output_df[
-                self.output_df['Data de início'].notna() & 
-                self.output_df['Data de entrega'].notna()
-            ]
-            
-            invalid_dates = both_dates[
-                both_dates['Data de início'] > both_dates['Data de entrega']
-            ]
+            if 'Data de início' in date_values and 'Data de entrega' in date_values:
+                invalid_count = np.count_nonzero(
+                    date_values['Data de início'] > date_values['Data de entrega']
+                )
+            else:
+                both_dates = self.output_df[
+                    self._date_filled['Data de início'] &
+                    self._date_filled['Data de entrega']
+                ]
+                invalid_count = len(both_dates[
+                    both_dates['Data de início'] > both_dates['Data de entrega']
+                ])
             
-            if len(invalid_dates) > 0:
-                issues.append(f"{len(invalid_dates)} registros com data de início após data de entrega")
+            if invalid_count > 0:
+                issues.append(f"{invalid_count} registros com data de início após data de entrega")
         
         # Verificar datas muito antigas ou futuras
-        date_cols = ['Data de início', 'Data de entrega', 'Data de conclusão']
         current_year = pd.Timestamp.now().year
         
+        # Limites equivalentes a ano < atual-2 e ano > atual+2
+        oldest_allowed = np.datetime64(f"{current_year - 2}-01-01", 'ns')
+        first_future = np.datetime64(f"{current_year + 3}-01-01", 'ns')
+        
         for col in date_cols:
             if col in self.output_df.columns:
-                dates = self.output_df[col].dropna()
-                if len(dates) > 0:
+                if col in date_values:
+                    values = date_values[col]
+                    old_dates = np.count_nonzero(values < oldest_allowed)
+                    future_dates = np.count_nonzero(values >= first_future)
+                else:
+                    dates = self.output_df[col].dropna()
+                    if len(dates) == 0:
+                        continue
                     old_dates = dates[dates.dt.year < current_year - 2].count()
                     future_dates = dates[dates.dt.year > current_year + 2].count()
-                    
-                    if old_dates > 0:
-                        issues.append(f"{col}: {old_dates} datas muito antigas (>{current_year-2})")
-                    if future_dates > 0:
-                        issues.append(f"{col}: {future_dates} datas muito futuras (<{current_year+2})")
+                
+                if old_dates > 0:
+                    issues.append(f"{col}: {old_dates} datas muito antigas (>{current_year-2})")
+                if future_dates > 0:
+                    issues.append(f"{col}: {future_dates} datas muito futuras (<{current_year+2})")
         
         if issues:
             return ValidationResult(
@@ -318,25 +479,27 @@ class PlannerValidator:
     
     def generate_statistics(self) -> Dict[str, Any]:
         """Gera estatísticas comparativas detalhadas."""
+        import numpy as np
+        import pandas as pd
+        
         stats = {
             "input_summary": {
                 "rows": len(self.input_df),
-                "columns": len(self.input_df.columns)
+                "columns": len(self.input_columns)
             },
             "output_summary": {
-                "rows": len(self.output_df),
-                "columns": len(self.output_df.columns)
+                "rows": self._n_out,
+                "columns": len(self.output_columns)
             }
         }
         
         # Estatísticas de datas
-        date_columns = ['Data de início', 'Data de entrega', 'Data de conclusão']
         stats["date_statistics"] = {}
         
-        for col in date_columns:
-            if col in self.output_df.columns:
-                filled = self.output_df[col].notna().sum()
-                total = len(self.output_df)
+        total = self._n_out
+        for col in self.DATE_COLUMNS:
+            if col in self._date_filled:
+                filled = np.count_nonzero(self._date_filled[col])
                 stats["date_statistics"][col] = {
                     "filled": filled,
                     "total": total,
@@ -345,11 +508,35 @@ class PlannerValidator:
         
         # Distribuição por bucket
         if 'Bucket' in self.output_df.columns:
-            bucket_dist = self.output_df['Bucket'].value_counts().to_dict()
-            stats["bucket_distribution"] = bucket_dist
+            # Contagem direta sobre os códigos (categóricos ou fatorados) com
+            # bincount, na mesma ordem do value_counts (mais frequente primeiro)
+            bucket = self.output_df['Bucket']
+            if isinstance(bucket.dtype, pd.CategoricalDtype):
+                codes = bucket.cat.codes.to_numpy()
+                labels = bucket.cat.categories
+            else:
+                codes, labels = pd.factorize(bucket)
+            counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+            order = np.argsort(-counts, kind='stable')
+            stats["bucket_distribution"] = {
+                labels[i]: int(counts[i]) for i in order if counts[i] > 0
+            }
         
         return stats
     
+    @staticmethod
+    def _run_validation(validation_func: Callable[[], ValidationResult]) -> ValidationResult:
+        """Executa uma validação, convertendo exceções em resultado de erro."""
+        try:
+            return validation_func()
+        except Exception as e:
+            return ValidationResult(
+                test_name=validation_func.__name__,
+                passed=False,
+                message=f"❌ Erro durante validação: {e}",
+                severity="ERROR"
+            )
+    
     def run_all_validations(self) -> bool:
         """
         Executa todas as validações.
@@ -373,17 +560,7 @@ class PlannerValidator:
         
         # Executar cada validação
         for validation_func in validations:
-            try:
-                result = validation_func()
-                self.results.append(result)
-            except Exception as e:
-                error_result = ValidationResult(
-                    test_name=validation_func.__name__,
-                    passed=False,
-                    message=f"❌ Erro durante validação: {e}",
-                    severity="ERROR"
-                )
-                self.results.append(error_result)
+            self.results.append(self._run_validation(validation_func))
         
         # Gerar estatísticas
         stats = self.generate_statistics()